@@ -10,21 +10,46 @@ import sys
 import json
 import subprocess
 from pathlib import Path
-from collections import defaultdict
 import argparse
-import csv
 import webbrowser
+import os
+import hashlib
+import tempfile
+import glob
+import itertools
+import functools
+from typing import IO, TYPE_CHECKING, Callable, Iterator, NamedTuple
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-import plotly.graph_objects as go
+import numpy as np
 
-import matplotlib.pyplot as plt
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON export
+    orjson = None
+
+
+def positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return n
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Visualize and export video bitrate over time"
     )
-    parser.add_argument("video", type=Path, help="Path to video file")
+    parser.add_argument(
+        "video",
+        type=Path,
+        help="Path to video file, or a directory / quoted glob pattern of videos",
+    )
     parser.add_argument(
         "--bucket",
         type=float,
@@ -66,12 +91,77 @@ def parse_args() -> argparse.Namespace:
         type=float,
         help="Optional target bitrate in kbps to show as a reference",
     )
+    parser.add_argument(
+        "--no-show",
+        action="store_true",
+        help="Do not open the interactive plot window",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-probe the video instead of using cached packet data",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Aggregate packets while probing instead of keeping them "
+        "(single ffprobe process, no cache)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=positive_int,
+        help="Worker processes for directory/glob input (default: CPU count)",
+    )
+    parser.add_argument(
+        "--plot-format",
+        default="png",
+        help="Image format for --save-plot with directory/glob input "
+        "(default: png; other formats are rendered with matplotlib)",
+    )
     return parser.parse_args()
 
 
-def probe_packets(video_path: Path) -> list[tuple[float, int]]:
+# Files shorter than this are probed by a single ffprobe process.
+SHARD_MIN_SEC = 300.0
+# Each shard reads this far past its end so B-frame reordering can't drop packets.
+SHARD_OVERLAP_SEC = 10.0
+
+
+def probe_timeline(video_path: Path) -> tuple[float, float] | None:
+    """
+    Return (start_time, duration) of the container, or None if ffprobe can't tell.
+    """
+    cmd = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=start_time,duration",
+        "-of",
+        "csv=p=0",
+        str(video_path),
+    ]
+    result = subprocess.run(cmd, check=True, text=True, capture_output=True)
+    try:
+        start, duration = (float(v) for v in result.stdout.strip().split(","))
+    except ValueError:  # "N/A" for streams without a known length
+        return None
+    return start, duration
+
+
+class Probe(NamedTuple):
+    """A running ffprobe, the file collecting its stderr and its shard bounds."""
+
+    proc: subprocess.Popen
+    errfile: IO[str]
+    start: float = -np.inf
+    end: float = np.inf
+
+
+def start_probe(video_path: Path, start: float = -np.inf, end: float = np.inf) -> Probe:
     """
-    Return a list of (pts_time, size_bytes) for every packet in the video stream.
+    Launch ffprobe listing video packets as "pts_time,size" CSV lines, limited to
+    packets around [start, end) when either bound is finite.
     Requires ffprobe (ships with FFmpeg) in PATH.
     """
     cmd = [
@@ -83,78 +173,468 @@ def probe_packets(video_path: Path) -> list[tuple[float, int]]:
         "-show_entries",
         "packet=pts_time,size",
         "-of",
-        "json",
-        str(video_path),
+        "csv=p=0",  # one "pts_time,size" line per packet
     ]
-    result = subprocess.run(cmd, check=True, text=True, capture_output=True)
-    data = json.loads(result.stdout)
-    packets = []
-    for pkt in data.get("packets", []):
-        pts = float(pkt["pts_time"])
-        size = int(pkt["size"])
-        packets.append((pts, size))
+    if np.isfinite(start) or np.isfinite(end):
+        t0 = f"{start:.6f}" if np.isfinite(start) else ""
+        t1 = f"{end + SHARD_OVERLAP_SEC:.6f}" if np.isfinite(end) else ""
+        cmd += ["-read_intervals", f"{t0}%{t1}"]
+    cmd.append(str(video_path))
+    # stderr goes to a temporary file rather than a pipe: a damaged file can make
+    # ffprobe fill the stderr pipe and block while we are still reading stdout.
+    errfile = tempfile.TemporaryFile(mode="w+")
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errfile, text=True)
+    except BaseException:
+        errfile.close()
+        raise
+    return Probe(proc, errfile, start, end)
+
+
+def _finish_probe(probe: Probe) -> None:
+    """
+    Wait for a start_probe() process and raise CalledProcessError if it failed.
+    """
+    proc = probe.proc
+    proc.stdout.close()
+    proc.wait()
+    with probe.errfile:
+        probe.errfile.seek(0)
+        stderr = probe.errfile.read()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args, stderr=stderr)
+
+
+def _abort_probe(probe: Probe) -> None:
+    """
+    Kill and reap a start_probe() process without raising, so that the error
+    which interrupted reading its output is the one that propagates.
+    """
+    probe.proc.kill()
+    probe.proc.wait()
+    probe.proc.stdout.close()
+    probe.errfile.close()
+
+
+def start_probes(video_path: Path, jobs: int = 1) -> list[Probe]:
+    """
+    Split the video timeline into up to jobs shards and launch one ffprobe per
+    shard. Returns the probes in timeline order.
+    """
+    timeline = probe_timeline(video_path) if jobs > 1 else None
+    if timeline is None or timeline[1] < SHARD_MIN_SEC:
+        return [start_probe(video_path)]
+    t0, duration = timeline
+    edges = np.linspace(t0, t0 + duration, jobs + 1)
+    edges[0], edges[-1] = -np.inf, np.inf
+    return [
+        start_probe(video_path, start, end) for start, end in zip(edges[:-1], edges[1:])
+    ]
+
+
+def _read_probe(probe: Probe) -> tuple[np.ndarray, np.ndarray]:
+    try:
+        # Some codecs report "N/A" for pts_time; those packets cannot be bucketed.
+        lines = (line for line in probe.proc.stdout if not line.startswith("N/A"))
+        first = next(lines, None)
+        if first is None:  # no video stream, or no usable pts
+            rows = np.empty((0, 2))
+        else:
+            rows = np.loadtxt(
+                itertools.chain([first], lines), delimiter=",", ndmin=2
+            ).reshape(-1, 2)
+    except BaseException:
+        _abort_probe(probe)
+        raise
+    _finish_probe(probe)
+    return rows[:, 0].copy(), rows[:, 1].astype(np.int64)
+
+
+def read_packets(probes: list[Probe]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Drain start_probes() processes and return (pts_time[], size_bytes[]) arrays.
+    Packets read past a shard's bounds are dropped so overlaps aren't counted twice.
+    """
+    # Drain every pipe concurrently; a full pipe would stall that shard's ffprobe.
+    with ThreadPoolExecutor(max_workers=len(probes)) as pool:
+        results = list(pool.map(_read_probe, probes))
+    if len(probes) == 1:
+        return results[0]
+
+    pts_parts, size_parts = [], []
+    for (pts, sizes), probe in zip(results, probes):
+        keep = (pts >= probe.start) & (pts < probe.end)
+        pts_parts.append(pts[keep])
+        size_parts.append(sizes[keep])
+    return np.concatenate(pts_parts), np.concatenate(size_parts)
+
+
+def packet_cache_path(video_path: Path) -> Path:
+    """
+    Return the .npz cache file for a video, keyed by its path, size and mtime so
+    that any change to the file invalidates the entry.
+    """
+    st = video_path.stat()
+    ident = f"{video_path.resolve()}|{st.st_size}|{st.st_mtime_ns}"
+    key = hashlib.sha1(ident.encode()).hexdigest()[:16]
+    cache_root = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return cache_root / "bitrate-viz" / f"{key}.npz"
+
+
+def load_cached_packets(cache_path: Path) -> tuple[np.ndarray, np.ndarray] | None:
+    try:
+        with np.load(cache_path) as data:
+            return data["pts"], data["sizes"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached_packets(
+    cache_path: Path, packets: tuple[np.ndarray, np.ndarray]
+) -> None:
+    # Write to a temporary file and rename so readers never see a partial cache.
+    tmp_name = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=cache_path.parent, suffix=".npz", delete=False
+        ) as f:
+            tmp_name = f.name
+            np.savez(f, pts=packets[0], sizes=packets[1])
+        os.replace(tmp_name, cache_path)
+    except OSError:
+        # caching is best-effort, but don't leave the partial file behind
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
+def probe_packets(
+    video_path: Path,
+    jobs: int = 1,
+    use_cache: bool = True,
+    before_read: Callable[[], None] | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return (pts_time[], size_bytes[]) arrays for every packet in the video stream.
+    On a cache miss, before_read is called once ffprobe has been started, so
+    slow setup work (e.g. plotting imports) can overlap with the probe.
+    """
+    cache_path = packet_cache_path(video_path) if use_cache else None
+    packets = load_cached_packets(cache_path) if cache_path else None
+    if packets is None:
+        probes = start_probes(video_path, jobs)
+        if before_read is not None:
+            before_read()
+        packets = read_packets(probes)
+        if cache_path:
+            save_cached_packets(cache_path, packets)
     return packets
 
 
-def aggregate_bitrate(
-    packets: list[tuple[float, int]], window_sec: float
-) -> tuple[list[float], list[float]]:
-    """
-    Aggregate bytes into window_sec buckets and convert to kilobits per second.
-    Returns times[] (bucket center) and kbps[] lists.
-    """
-    bucket_totals = defaultdict(int)  # bucket_index -> bytes
-    for pts, size in packets:
-        idx = int(pts // window_sec)
-        bucket_totals[idx] += size
-
-    times = []
-    kbps = []
-    for idx in sorted(bucket_totals):
-        midpoint = (idx + 0.5) * window_sec
-        bits = bucket_totals[idx] * 8  # bytes -> bits
-        rate = bits / window_sec / 1000  # bits/s -> kbps
-        times.append(midpoint)
-        kbps.append(rate)
+# Importing Numba and loading the compiled kernels costs ~0.3 s, against ~9 ns
+# saved per packet over the numpy path, so only long videos come out ahead.
+JIT_MIN_PACKETS = 40_000_000
+
+
+@functools.cache
+def _jit(fn: Callable, **options) -> Callable | None:
+    """Compile fn with Numba on first use, or return None if it isn't installed."""
+    try:
+        from numba import njit
+    except ImportError:  # optional: compiled bucket aggregation
+        return None
+    return njit(cache=True, **options)(fn)
+
+
+def _update_buckets(
+    pts: np.ndarray,
+    sizes: np.ndarray,
+    totals: np.ndarray,
+    origin: int,
+    inv_window: float,
+) -> None:
+    """Add packet sizes into totals in place in a single fused pass."""
+    for i in range(pts.size):
+        idx = max(int(pts[i] * inv_window), 0)
+        totals[idx - origin] += sizes[i]
+
+
+def _update_unit_buckets(
+    pts: np.ndarray,
+    sizes: np.ndarray,
+    totals: np.ndarray,
+    origin: int,
+    inv_window: float,
+) -> None:
+    """_update_buckets for 1 s buckets, where truncating pts is the index."""
+    for i in range(pts.size):
+        idx = max(int(pts[i]), 0)
+        totals[idx - origin] += sizes[i]
+
+
+def _stats(a: np.ndarray) -> tuple[float, float, float]:
+    """Return (min, max, mean) of a non-empty array in one streaming pass."""
+    mn = a[0]
+    mx = a[0]
+    total = 0.0
+    for v in a:
+        if v < mn:
+            mn = v
+        if v > mx:
+            mx = v
+        total += v
+    return mn, mx, total / a.size
+
+
+def _accumulate(
+    pts: np.ndarray,
+    sizes: np.ndarray,
+    totals: np.ndarray,
+    origin: int | None,
+    inv_window: float,
+    compiled: bool = False,
+) -> tuple[np.ndarray, int, int]:
+    """
+    Add packet sizes into totals, where totals[i] holds the bytes of bucket
+    origin + i, growing or shifting it as needed. origin is None until the first
+    packets arrive. compiled selects the Numba kernels when Numba is installed.
+    Returns the possibly reallocated totals, its origin and the bucket index
+    just past the last one these packets touch.
+    """
+    # pts is in decode order, so B-frames make the first/last packet unreliable
+    first = max(int(pts.min() * inv_window), 0)
+    end = max(int(pts.max() * inv_window), 0) + 1
+    if origin is None:
+        origin = first
+    elif first < origin:
+        shifted = np.zeros(totals.size + origin - first)
+        shifted[origin - first :] = totals
+        totals, origin = shifted, first
+    if end - origin > totals.size:
+        grown = np.zeros(max(end - origin, 2 * totals.size))
+        grown[: totals.size] = totals
+        totals = grown
+    # 1 s buckets (the default) need no scaling at all.
+    unit = inv_window == 1.0
+    kernel = compiled and _jit(
+        _update_unit_buckets if unit else _update_buckets, fastmath=True
+    )
+    if kernel:
+        kernel(pts, sizes, totals, origin, inv_window)
+    else:
+        idx = (pts if unit else pts * inv_window).astype(np.int64)
+        np.clip(idx, 0, None, out=idx)  # packets with negative pts go to bucket 0
+        idx -= origin
+        totals += np.bincount(idx, weights=sizes, minlength=totals.size)
+    return totals, origin, end
+
+
+def _to_kbps(
+    totals: np.ndarray, origin: int, window_sec: float
+) -> tuple[np.ndarray, np.ndarray]:
+    times = (origin + np.arange(len(totals)) + 0.5) * window_sec  # bucket midpoints
+    kbps = totals * (8.0 / window_sec / 1000.0)  # bytes -> bits -> kbps
     return times, kbps
 
 
-def compute_stats(kbps: list[float]) -> tuple[float, float, float]:
-    if not kbps:
+def aggregate_bitrate(
+    pts: np.ndarray, sizes: np.ndarray, window_sec: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate the parallel pts[]/sizes[] packet arrays into window_sec buckets
+    and convert to kilobits per second.
+    Returns times[] (bucket center) and kbps[] arrays covering every bucket from
+    the first packet to the last; buckets without packets in between are
+    reported as 0 kbps so gaps in the stream aren't interpolated over when
+    plotted.
+    """
+    pts = np.asarray(pts, dtype=np.float64)
+    sizes = np.asarray(sizes, dtype=np.int64)
+    if pts.size == 0:
+        return np.empty(0), np.empty(0)
+
+    # Multiplying by the reciprocal avoids a division per packet and lets the
+    # loops vectorize.
+    totals, origin, _ = _accumulate(
+        pts,
+        sizes,
+        np.zeros(0),
+        None,
+        1.0 / window_sec,
+        compiled=pts.size >= JIT_MIN_PACKETS,
+    )
+    return _to_kbps(totals, origin, window_sec)
+
+
+def _parse_csv_block(text: str) -> tuple[np.ndarray, np.ndarray]:
+    """Parse complete "pts_time,size" lines into (pts[], sizes[]) arrays."""
+    if "N/A" in text:
+        # Some codecs report "N/A" for pts_time; those packets cannot be bucketed.
+        text = "\n".join(ln for ln in text.splitlines() if not ln.startswith("N/A"))
+    values = np.fromstring(text.strip().replace("\n", ","), sep=",").reshape(-1, 2)
+    return values[:, 0].copy(), values[:, 1].astype(np.int64)
+
+
+def _read_blocks(
+    stream: IO[str], block_size: int
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield (pts[], sizes[]) for each block of complete CSV lines in stream."""
+    tail = ""
+    while True:
+        block = stream.read(block_size)
+        # Only parse whole lines; carry the partial last line into the next read.
+        text = tail + block
+        cut = len(text) if not block else text.rfind("\n") + 1
+        text, tail = text[:cut], text[cut:]
+        pts, sizes = _parse_csv_block(text)
+        if pts.size:
+            yield pts, sizes
+        if not block:
+            return
+
+
+def stream_bitrate(
+    video_path: Path, window_sec: float, block_size: int = 1 << 16
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Aggregate packets into window_sec buckets while ffprobe is still listing
+    them, so memory stays proportional to the number of buckets rather than
+    packets. Returns the same times[] and kbps[] as aggregate_bitrate().
+    """
+    probe = start_probe(video_path)
+    inv_window = 1.0 / window_sec
+    totals = np.zeros(1024)
+    origin = None
+    end = 0
+    seen = 0
+    blocks = _read_blocks(probe.proc.stdout, block_size)
+    try:
+        for pts, sizes in blocks:
+            seen += pts.size
+            totals, origin, block_end = _accumulate(
+                pts,
+                sizes,
+                totals,
+                origin,
+                inv_window,
+                compiled=seen >= JIT_MIN_PACKETS,
+            )
+            end = max(end, block_end)
+    except BaseException:
+        _abort_probe(probe)
+        raise
+    finally:
+        blocks.close()
+    _finish_probe(probe)
+    if origin is None:
+        return np.empty(0), np.empty(0)
+    return _to_kbps(totals[: end - origin], origin, window_sec)
+
+
+def compute_stats(kbps: np.ndarray) -> tuple[float, float, float]:
+    arr = np.asarray(kbps, dtype=np.float64)
+    if arr.size == 0:
         return 0.0, 0.0, 0.0
-    mn = min(kbps)
-    mx = max(kbps)
-    avg = sum(kbps) / len(kbps)
-    return mn, mx, avg
+    stats = arr.size >= JIT_MIN_PACKETS and _jit(_stats)
+    if stats:
+        # Large series are memory-bound: read the data once instead of three times
+        mn, mx, avg = stats(arr)
+    else:
+        mn, mx, avg = arr.min(), arr.max(), arr.mean()
+    return float(mn), float(mx), float(avg)
+
+
+def format_stats(kbps: np.ndarray) -> str:
+    mn, mx, avg = compute_stats(kbps)
+    return f"min={mn:.0f} kbps\nmax={mx:.0f} kbps\navg={avg:.0f} kbps"
+
+
+def downsample(
+    times: np.ndarray, kbps: np.ndarray, max_points: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce the series to roughly max_points by keeping the min and max sample of
+    each consecutive chunk, so bitrate spikes survive the decimation.
+    """
+    n = len(kbps)
+    if n <= max_points:
+        return times, kbps
+    chunk = -(-2 * n // max_points)  # ceil division
+    usable = n - n % chunk
+    rows = kbps[:usable].reshape(-1, chunk)
+    base = np.arange(rows.shape[0]) * chunk
+    keep = np.concatenate(
+        [base + rows.argmin(axis=1), base + rows.argmax(axis=1), np.arange(usable, n)]
+    )
+    keep = np.unique(keep)  # sorted, and drops chunks where min and max coincide
+    return times[keep], kbps[keep]
+
+
+def make_figure() -> tuple["Figure", "Axes"]:
+    """
+    Create the bitrate figure once; plot_bitrate() swaps the data in place so
+    batch runs skip figure and axes construction for every video.
+    """
+    import matplotlib.pyplot as plt
+
+    plt.rcParams["path.simplify"] = True
+    plt.rcParams["path.simplify_threshold"] = 1.0
+    plt.rcParams["agg.path.chunksize"] = 10000
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot([], [], linewidth=1)
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("Bitrate (kbps)")
+    ax.grid(True, linestyle="--", linewidth=0.5)
+    # Fixed margins leave room for six-digit kbps ticks without re-running
+    # tight_layout for each plot.
+    fig.subplots_adjust(left=0.1, right=0.98, bottom=0.1, top=0.93)
+    return fig, ax
 
 
 def plot_bitrate(
-    times: list[float],
-    kbps: list[float],
+    fig: "Figure",
+    ax: "Axes",
+    times: np.ndarray,
+    kbps: np.ndarray,
     video_name: str,
     save_path: Path | None = None,
     show_stats: bool = False,
     target_kbps: float | None = None,
+    show: bool = True,
 ) -> None:
-    plt.figure(figsize=(10, 5))
-    plt.plot(times, kbps, linewidth=1)
-    plt.title(f"Variable Bitrate – {video_name}")
-    plt.xlabel("Time (s)")
-    plt.ylabel("Bitrate (kbps)")
-    plt.grid(True, linestyle="--", linewidth=0.5)
+    import matplotlib.pyplot as plt
+
+    # Drop the previous video's overlays, keeping the bitrate line itself.
+    line, *overlays = ax.lines
+    for artist in overlays + list(ax.texts):
+        artist.remove()
+    if ax.get_legend() is not None:
+        ax.get_legend().remove()
+
+    if len(kbps) > 50_000:
+        # Two points per horizontal pixel is all the raster can show anyway.
+        width_px = int(fig.get_figwidth() * fig.dpi)
+        plot_times, plot_kbps = downsample(times, kbps, 2 * width_px)
+    else:
+        plot_times, plot_kbps = times, kbps
+    line.set_data(plot_times, plot_kbps)
+    ax.relim()
+    ax.autoscale_view()
+    ax.set_title(f"Variable Bitrate – {video_name}")
     if target_kbps is not None:
-        plt.axhline(
+        ax.axhline(
             target_kbps,
             linestyle="--",
             color="red",
             label=f"target {target_kbps:.0f} kbps",
         )
-    if show_stats and kbps:
-        avg = sum(kbps) / len(kbps)
-        mn = min(kbps)
-        mx = max(kbps)
-        text = f"min={mn:.0f} kbps\nmax={mx:.0f} kbps\navg={avg:.0f} kbps"
-        plt.annotate(
+        ax.legend()
+    if show_stats and len(kbps):
+        text = format_stats(kbps)
+        ax.annotate(
             text,
             xy=(0.99, 0.95),
             xycoords="axes fraction",
@@ -162,22 +642,148 @@ def plot_bitrate(
             va="top",
             bbox=dict(boxstyle="round", fc="white", ec="gray", alpha=0.8),
         )
-    plt.tight_layout()
-    if target_kbps is not None:
-        plt.legend()
     if save_path:
-        plt.savefig(save_path)
-    plt.show()
+        fig.savefig(save_path)
+    if show:
+        plt.show()
+
+
+def _nice_ticks(lo: float, hi: float, count: int = 6) -> np.ndarray:
+    """Return evenly spaced round tick values covering [lo, hi]."""
+    raw = (hi - lo) / count
+    magnitude = 10 ** np.floor(np.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw)
+    return np.arange(np.ceil(lo / step) * step, hi + step * 1e-9, step)
+
+
+def _fast_png(
+    times: np.ndarray,
+    kbps: np.ndarray,
+    video_name: str,
+    save_path: Path,
+    show_stats: bool = False,
+    target_kbps: float | None = None,
+) -> None:
+    """
+    Rasterize the bitrate line straight into a PNG with Pillow, skipping
+    matplotlib's transforms, tick locators and text layout.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    width, height = 1000, 500  # same pixel size as the 10x5 in figure at 100 dpi
+    left, right, top, bottom = 80, 20, 40, 50
+    plot_w, plot_h = width - left - right, height - top - bottom
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=12)
+
+    t0, t1 = (float(times[0]), float(times[-1])) if len(times) else (0.0, 1.0)
+    if t1 - t0 < 1e-9:  # a single bucket: center it instead of dividing by ~0
+        t0, t1 = t0 - 0.5, t1 + 0.5
+    y1 = max(float(kbps.max()) if len(kbps) else 0.0, target_kbps or 0.0) * 1.05
+    y1 = max(y1, 1.0)
+
+    def to_x(t: np.ndarray) -> np.ndarray:
+        return left + (t - t0) * (plot_w / (t1 - t0))
+
+    def to_y(v: np.ndarray) -> np.ndarray:
+        return top + plot_h - v * (plot_h / y1)
+
+    def dashed(
+        x0: float,
+        x1: float,
+        y: float,
+        fill: str | tuple[int, int, int],
+        dash: int = 6,
+        width: int = 1,
+    ) -> None:
+        for x in range(int(x0), int(x1), 2 * dash):
+            draw.line([(x, y), (min(x + dash, x1), y)], fill=fill, width=width)
+
+    # Grid and tick labels
+    for t in _nice_ticks(t0, t1):
+        x = float(to_x(t))
+        draw.line([(x, top), (x, top + plot_h)], fill=(220, 220, 220))
+        draw.text((x, top + plot_h + 6), f"{t:g}", fill="black", font=font, anchor="mt")
+    for v in _nice_ticks(0.0, y1):
+        y = float(to_y(v))
+        dashed(left, left + plot_w, y, fill=(200, 200, 200), dash=3)
+        draw.text((left - 6, y), f"{v:g}", fill="black", font=font, anchor="rm")
+    draw.rectangle([left, top, left + plot_w, top + plot_h], outline="black")
+
+    if len(kbps):
+        plot_times, plot_kbps = downsample(times, kbps, 2 * plot_w)
+        points = np.column_stack([to_x(plot_times), to_y(plot_kbps)])
+        if len(points) == 1:  # a one-point line draws nothing
+            x, y = points[0]
+            draw.ellipse([x - 2, y - 2, x + 2, y + 2], fill=(31, 119, 180))
+        else:
+            draw.line(points.ravel().tolist(), fill=(31, 119, 180), width=1)
+    if target_kbps is not None:
+        dashed(left, left + plot_w, float(to_y(target_kbps)), fill="red", width=2)
+        label = f"target {target_kbps:.0f} kbps"
+        box = draw.textbbox((left + 8, top + 8), label, font=font)
+        draw.rectangle(
+            [box[0] - 4, box[1] - 4, box[2] + 4, box[3] + 4],
+            fill="white",
+            outline="gray",
+        )
+        draw.text((left + 8, top + 8), label, fill="red", font=font)
+    if show_stats and len(kbps):
+        text = format_stats(kbps)
+        anchor = (left + plot_w - 8, top + 8)
+        box = draw.multiline_textbbox(
+            anchor, text, font=font, anchor="ra", align="right"
+        )
+        draw.rectangle(
+            [box[0] - 4, box[1] - 4, box[2] + 4, box[3] + 4],
+            fill="white",
+            outline="gray",
+        )
+        draw.multiline_text(
+            anchor, text, fill="black", font=font, anchor="ra", align="right"
+        )
+
+    draw.text(
+        (width / 2, top / 2),
+        f"Variable Bitrate - {video_name}",  # default font has no en dash
+        fill="black",
+        font=font,
+        anchor="mm",
+    )
+    draw.text(
+        (left + plot_w / 2, height - 12),
+        "Time (s)",
+        fill="black",
+        font=font,
+        anchor="mm",
+    )
+    ylabel = Image.new("RGB", (160, 16), "white")
+    ImageDraw.Draw(ylabel).text(
+        (80, 8), "Bitrate (kbps)", fill="black", font=font, anchor="mm"
+    )
+    img.paste(ylabel.rotate(90, expand=True), (4, top + plot_h // 2 - 80))
+    img.save(save_path)
 
 
 def plotly_bitrate(
-    times: list[float],
-    kbps: list[float],
+    times: np.ndarray,
+    kbps: np.ndarray,
     video_name: str,
     html_path: Path,
     target_kbps: float | None = None,
+    auto_open: bool = True,
 ) -> None:
-    fig = go.Figure(data=go.Scatter(x=times, y=kbps, mode="lines", line=dict(width=1)))
+    import plotly.graph_objects as go
+
+    # WebGL trace; float32 arrays are embedded as base64 typed arrays by plotly 6
+    trace = go.Scattergl(
+        x=np.asarray(times, dtype=np.float32),
+        y=np.asarray(kbps, dtype=np.float32),
+        mode="lines",
+        line=dict(width=1),
+    )
+    fig = go.Figure(data=trace)
     fig.update_layout(
         title=f"Variable Bitrate – {video_name}",
         xaxis_title="Time (s)",
@@ -185,35 +791,228 @@ def plotly_bitrate(
     )
     if target_kbps is not None:
         fig.add_hline(y=target_kbps, line_dash="dash", line_color="red")
-    fig.write_html(str(html_path), auto_open=True)
+    fig.write_html(
+        str(html_path), include_plotlyjs="cdn", auto_open=auto_open, validate=False
+    )
 
 
 def export_data(
-    times: list[float],
-    kbps: list[float],
+    times: np.ndarray,
+    kbps: np.ndarray,
     csv_path: Path | None,
     json_path: Path | None,
 ) -> None:
     if csv_path:
-        with open(csv_path, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(["time_sec", "bitrate_kbps"])
-            for t, b in zip(times, kbps):
-                writer.writerow([t, b])
+        np.savetxt(
+            csv_path,
+            np.column_stack([times, kbps]),
+            fmt="%.10g",
+            delimiter=",",
+            header="time_sec,bitrate_kbps",
+            comments="",
+        )
     if json_path:
-        with open(json_path, "w") as f:
-            records = [{"time_sec": t, "bitrate_kbps": b} for t, b in zip(times, kbps)]
-            json.dump(records, f, indent=2)
+        # Columnar layout: two arrays instead of one object per bucket.
+        columns = {
+            "time_sec": np.asarray(times, dtype=np.float64),
+            "bitrate_kbps": np.asarray(kbps, dtype=np.float64),
+        }
+        if orjson is not None:
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2
+            Path(json_path).write_bytes(orjson.dumps(columns, option=option))
+        else:
+            with open(json_path, "w") as f:
+                json.dump({k: v.tolist() for k, v in columns.items()}, f, indent=2)
+
+
+# File extensions picked up when a directory is given instead of a video.
+VIDEO_SUFFIXES = {
+    ".avi",
+    ".flv",
+    ".m4v",
+    ".mkv",
+    ".mov",
+    ".mp4",
+    ".mpeg",
+    ".mpg",
+    ".ts",
+    ".webm",
+    ".wmv",
+}
+
+
+def find_videos(spec: Path) -> list[Path] | None:
+    """
+    Expand a directory or glob pattern into the video files it names.
+    Returns None when spec is a plain file path.
+    """
+    if spec.is_file():  # "Movie [1080p].mkv" is a file name, not a pattern
+        return None
+    if spec.is_dir():
+        return sorted(
+            p
+            for p in spec.iterdir()
+            if p.is_file() and p.suffix.lower() in VIDEO_SUFFIXES
+        )
+    if any(c in str(spec) for c in "*?["):
+        return sorted(Path(p) for p in glob.glob(str(spec)) if Path(p).is_file())
+    return None
+
+
+def batch_names(videos: list[Path]) -> list[str]:
+    """
+    Return a distinct output name per video: its file name, or its path relative
+    to the videos' common directory when file names collide.
+    """
+    counts = Counter(video.name for video in videos)
+    root = Path(os.path.commonpath([video.resolve() for video in videos]))
+    names: list[str] = []
+    for video in videos:
+        name = video.name
+        if counts[name] > 1:
+            name = "_".join(video.resolve().relative_to(root).parts)
+        unique, n = name, 1
+        while unique in names:
+            n += 1
+            unique = f"{name}-{n}"
+        names.append(unique)
+    return names
+
+
+def batch_output(base: Path | None, name: str, suffix: str) -> Path | None:
+    """
+    In batch mode each output option names a directory; return the file in it
+    for the video with output name name.
+    """
+    if base is None:
+        return None
+    base.mkdir(parents=True, exist_ok=True)
+    return base / f"{name}{suffix}"
+
+
+def process_one(
+    video: Path, name: str, args: argparse.Namespace
+) -> tuple[np.ndarray, np.ndarray, str]:
+    """
+    Probe, aggregate and export one video of a batch run. Runs in a worker
+    process, so it does no plotting.
+    """
+    if args.low_memory:
+        times, kbps = stream_bitrate(video, args.bucket)
+    else:
+        pts, sizes = probe_packets(video, use_cache=not args.no_cache)
+        times, kbps = aggregate_bitrate(pts, sizes, args.bucket)
+
+    stats_text = format_stats(kbps)
+    stats_file = batch_output(args.stats_file, name, ".txt")
+    if stats_file:
+        with open(stats_file, "w") as f:
+            f.write(stats_text + "\n")
+    export_data(
+        times,
+        kbps,
+        batch_output(args.export_csv, name, ".csv"),
+        batch_output(args.export_json, name, ".json"),
+    )
+    return times, kbps, stats_text
+
+
+def run_batch(args: argparse.Namespace, videos: list[Path]) -> None:
+    """
+    Process many videos in parallel worker processes. Plots are rendered here
+    in the main process, never in a window. A video that fails is reported and
+    skipped.
+    """
+    names = batch_names(videos)
+    plot_suffix = "." + args.plot_format.lower().lstrip(".")
+    fig = ax = None  # one matplotlib figure, reused for every non-PNG plot
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [
+            pool.submit(process_one, video, name, args)
+            for video, name in zip(videos, names)
+        ]
+        for video, name, future in zip(videos, names, futures):
+            try:
+                times, kbps, stats_text = future.result()
+                if args.stats:
+                    print(f"{video}:\n{stats_text}")
+                html_path = batch_output(args.plotly_html, name, ".html")
+                if html_path:
+                    plotly_bitrate(
+                        times,
+                        kbps,
+                        video.name,
+                        html_path,
+                        target_kbps=args.target_bitrate,
+                        auto_open=False,
+                    )
+                plot_path = batch_output(args.save_plot, name, plot_suffix)
+                if plot_path and plot_suffix == ".png":
+                    _fast_png(
+                        times,
+                        kbps,
+                        video.name,
+                        plot_path,
+                        show_stats=args.stats,
+                        target_kbps=args.target_bitrate,
+                    )
+                elif plot_path:
+                    if fig is None:
+                        fig, ax = make_figure()
+                    plot_bitrate(
+                        fig,
+                        ax,
+                        times,
+                        kbps,
+                        video.name,
+                        save_path=plot_path,
+                        show_stats=args.stats,
+                        target_kbps=args.target_bitrate,
+                        show=False,
+                    )
+            except subprocess.CalledProcessError as exc:
+                print(f"{video}: ffprobe failed: {exc.stderr.strip()}", file=sys.stderr)
+            except (ValueError, OSError) as exc:
+                print(f"{video}: {exc}", file=sys.stderr)
 
 
 def main() -> None:
     args = parse_args()
 
-    packets = probe_packets(args.video)
-    times, kbps = aggregate_bitrate(packets, args.bucket)
+    videos = find_videos(args.video)
+    if videos == []:
+        sys.exit(f"error: no videos found for {args.video}")
+    if videos is not None:
+        run_batch(args, videos)
+        return
 
-    mn, mx, avg = compute_stats(kbps)
-    stats_text = f"min={mn:.0f} kbps\nmax={mx:.0f} kbps\navg={avg:.0f} kbps"
+    # A PNG with no window to show doesn't need matplotlib at all.
+    fast_png = (
+        args.no_show
+        and args.save_plot is not None
+        and args.save_plot.suffix.lower() == ".png"
+    )
+    use_matplotlib = not args.no_show or (args.save_plot and not fast_png)
+
+    def preload_plotting() -> None:
+        # Runs while ffprobe scans the file, hiding the import cost.
+        if use_matplotlib:
+            import matplotlib.pyplot  # noqa: F401
+        if args.plotly_html:
+            import plotly.graph_objects  # noqa: F401
+
+    if args.low_memory:
+        times, kbps = stream_bitrate(args.video, args.bucket)
+    else:
+        pts, sizes = probe_packets(
+            args.video,
+            jobs=min(os.cpu_count() or 1, 8),
+            use_cache=not args.no_cache,
+            before_read=preload_plotting,
+        )
+        times, kbps = aggregate_bitrate(pts, sizes, args.bucket)
+
+    stats_text = format_stats(kbps)
     if args.stats:
         print(stats_text)
     if args.stats_file:
@@ -231,14 +1030,28 @@ def main() -> None:
             target_kbps=args.target_bitrate,
         )
 
-    plot_bitrate(
-        times,
-        kbps,
-        args.video.name,
-        save_path=args.save_plot,
-        show_stats=args.stats,
-        target_kbps=args.target_bitrate,
-    )
+    if fast_png:
+        _fast_png(
+            times,
+            kbps,
+            args.video.name,
+            args.save_plot,
+            show_stats=args.stats,
+            target_kbps=args.target_bitrate,
+        )
+    elif use_matplotlib:
+        fig, ax = make_figure()
+        plot_bitrate(
+            fig,
+            ax,
+            times,
+            kbps,
+            args.video.name,
+            save_path=args.save_plot,
+            show_stats=args.stats,
+            target_kbps=args.target_bitrate,
+            show=not args.no_show,
+        )
 
 
 if __name__ == "__main__":